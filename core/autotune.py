@@ -0,0 +1,176 @@
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import time
+
+TUNING_PATH = os.path.join('config', 'tuning.json')
+
+class UmaAutotuner:
+    def __init__(self, config, path=TUNING_PATH):
+        self.cfg = config
+        self.path = path
+        self.sample_size = config.get('AUTOTUNE_SAMPLE_SIZE', 256)
+        self.repeats = config.get('AUTOTUNE_REPEATS', 3)
+        self.settings = self.load()
+
+    # =========================================================================
+    # PART A: SAVED SETTINGS
+    # =========================================================================
+    def load(self):
+        """Returns the saved { scan_type: settings } map, or {} if never tuned."""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  [Warn] Ignoring unreadable tuning file {self.path}: {e}")
+            return {}
+
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.settings, f, indent=4)
+
+    def get_settings(self, scan_type, total_items):
+        """
+        Returns (num_workers, chunk_size) for a scan.
+        Falls back to one process per core and one chunk per worker if not tuned.
+        """
+        tuned = self.settings.get(scan_type, {})
+        num_workers = tuned.get('num_workers') or max(1, (os.cpu_count() or 4))
+        batches_per_worker = tuned.get('batches_per_worker', 1)
+        chunk_size = total_items // (num_workers * batches_per_worker) + 1
+        return num_workers, chunk_size
+
+    # =========================================================================
+    # PART B: CALIBRATION
+    # =========================================================================
+    def candidates(self):
+        """(num_workers, batches_per_worker) pairs to try, from I/O-friendly to CPU-friendly."""
+        cpus = os.cpu_count() or 4
+        worker_counts = sorted(set(max(1, n) for n in (cpus // 4, cpus // 2, cpus, cpus * 2)))
+        return [(w, b) for w in worker_counts for b in (1, 4)]
+
+    def calibrate(self, scan_type, items, run_trial, get_paths=None, reset=None):
+        """
+        Runs run_trial(pool, sample, chunk_size) for every candidate and keeps the highest median items/sec.
+        run_trial dispatches through timed_task and returns the workers' summed CPU seconds.
+        CPU busy / I/O wait are recorded for reference only; they do not affect the choice.
+
+        Every candidate is timed on the same sample, AUTOTUNE_REPEATS times in a shuffled order,
+        so per-story cost differences cancel out. Before each trial reset() clears trial output
+        (e.g. extracted WAVs) and the sample's dat files are evicted from the OS cache where
+        possible. The pool is started and warmed up before the clock starts, since a full scan
+        pays that cost once.
+        """
+        if not items:
+            print(f"  [{scan_type}] No items to calibrate on, skipping.")
+            return None
+
+        sample = random.sample(list(items), min(self.sample_size, len(items)))
+        sample_paths = sorted(set(p for item in sample for p in get_paths(item))) if get_paths else []
+        trials = {candidate: [] for candidate in self.candidates()}
+        manager = multiprocessing.Manager()
+
+        for _ in range(self.repeats):
+            order = list(trials)
+            random.shuffle(order)
+            for num_workers, batches_per_worker in order:
+                if reset: reset()
+                _evict_from_cache(sample_paths)
+                chunk_size = len(sample) // (num_workers * batches_per_worker) + 1
+
+                with multiprocessing.Pool(processes=num_workers) as pool:
+                    # Each warm-up task blocks until all num_workers are inside it, so every
+                    # process must have spawned (and imported main) before timing starts
+                    barrier = manager.Barrier(num_workers)
+                    pool.map(_warm_up, [barrier] * num_workers, chunksize=1)
+                    before = IoWaitSnapshot()
+                    start_time = time.time()
+                    cpu_seconds = run_trial(pool, sample, chunk_size)
+                    duration = time.time() - start_time
+                    io_wait = before.io_wait_since()
+
+                rate = len(sample) / duration if duration > 0 else 0
+                # Busy = worker CPU time over the CPU time the pool could have used in that window
+                capacity = duration * min(num_workers, os.cpu_count() or 1)
+                cpu_busy = cpu_seconds / capacity if capacity > 0 else None
+                trials[(num_workers, batches_per_worker)].append((rate, cpu_busy, io_wait))
+        manager.shutdown()
+        if reset: reset()
+
+        best = None
+        for (num_workers, batches_per_worker), results in trials.items():
+            rate = _median([r[0] for r in results])
+            cpu_busy = _median([r[1] for r in results if r[1] is not None])
+            io_wait = _median([r[2] for r in results if r[2] is not None])
+            cpu_str = f"{cpu_busy:.0%}" if cpu_busy is not None else "n/a"
+            io_str = f"{io_wait:.0%}" if io_wait is not None else "n/a"
+            print(f"  [{scan_type}] workers={num_workers:<3} batches/worker={batches_per_worker} "
+                  f"-> {rate:8.1f} items/s (median of {len(results)}) | CPU {cpu_str} | I/O wait {io_str}")
+
+            if best is None or rate > best['items_per_sec']:
+                best = {
+                    'num_workers': num_workers, 'batches_per_worker': batches_per_worker,
+                    'items_per_sec': round(rate, 2),
+                    'cpu_busy': round(cpu_busy, 3) if cpu_busy is not None else None,
+                    'io_wait': round(io_wait, 3) if io_wait is not None else None
+                }
+
+        self.settings[scan_type] = best
+        print(f"  [{scan_type}] Best: {best['num_workers']} workers x {best['batches_per_worker']} batches/worker "
+              f"({best['items_per_sec']} items/s)")
+        return best
+
+def _median(values):
+    return statistics.median(values) if values else None
+
+def _evict_from_cache(paths):
+    """Drops files from the OS page cache so every trial starts cold. No-op without posix_fadvise."""
+    if not hasattr(os, 'posix_fadvise'): return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+def _warm_up(barrier):
+    """Returns once every pool process has reached the barrier (i.e. has fully started)."""
+    barrier.wait(timeout=300)
+
+def timed_task(task, *args):
+    """Pool entry point for calibration: returns the CPU seconds this worker spent in task(*args)."""
+    start = time.process_time()
+    task(*args)
+    return time.process_time() - start
+
+class IoWaitSnapshot:
+    """
+    System-wide I/O wait between two points in time, from /proc/stat.
+    Other platforms expose no equivalent, so I/O wait is reported as None there.
+    """
+    def __init__(self):
+        self.proc_stat = self._read_proc_stat()
+
+    @staticmethod
+    def _read_proc_stat():
+        try:
+            with open('/proc/stat', 'r') as f:
+                fields = f.readline().split()[1:]
+            return [int(v) for v in fields]
+        except (OSError, ValueError):
+            return None
+
+    def io_wait_since(self):
+        """Returns the fraction of CPU time spent waiting on I/O since this snapshot, or None."""
+        now = self._read_proc_stat()
+        if not (self.proc_stat and now): return None
+        delta = [b - a for a, b in zip(self.proc_stat, now)]
+        total = sum(delta[:8]) or 1
+        return delta[4] / total
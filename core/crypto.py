@@ -7,6 +7,7 @@ import UnityPy
 class UmaCrypto:
     def __init__(self, config):
         self.cfg = config
+        self.bytes_read = 0  # Asset bytes actually read from disk by this instance
 
     def get_meta_connection(self):
         """Returns a connection to the encrypted 'meta' database."""
@@ -35,6 +36,13 @@ class UmaCrypto:
         Decrypts a Unity asset (timeline, lipsync, ruby) based on its manifest key.
         Returns a UnityPy environment object.
         """
+        return UnityPy.load(self.decrypt_bytes(item_dict))
+
+    def decrypt_bytes(self, item_dict):
+        """
+        Decrypts a Unity asset based on its manifest key.
+        Returns the raw decrypted buffer (bytes) before UnityPy parsing.
+        """
         file_path = item_dict['path']
         file_key = item_dict['encryption_key']
         
@@ -43,10 +51,11 @@ class UmaCrypto:
 
         with open(file_path, "rb") as f:
             data = bytearray(f.read())
+        self.bytes_read += len(data)
 
         # If key is 0, file is not encrypted (common for audio, rare for assets)
         if file_key == 0:
-            return UnityPy.load(bytes(data))
+            return bytes(data)
 
         # XOR Decryption Logic for Assets
         base_keys = bytes.fromhex(self.cfg['AB_KEY_HEX'])
@@ -66,4 +75,4 @@ class UmaCrypto:
             for i in range(header_size, len(data)):
                 data[i] ^= f_key[i % f_key_len]
         
-        return UnityPy.load(bytes(data))
\ No newline at end of file
+        return bytes(data)
\ No newline at end of file
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import zlib
+
+# Stages are checked in pipeline order so a mismatch is blamed on the first one that diverges.
+STAGES = ('decrypt', 'parse')
+
+class UmaIntegrity:
+    def __init__(self, config):
+        self.cfg = config
+        self.baseline_path = os.path.join(config['PATHS']['output'], 'stress_baseline.json')
+
+    # =========================================================================
+    # PART A: DIGESTS
+    # =========================================================================
+    @staticmethod
+    def digest_buffer(*buffers):
+        """BLAKE2b digest of one or more raw decrypted buffers (C-level, catches reordered bytes)."""
+        h = hashlib.blake2b(digest_size=16)
+        for data in buffers:
+            h.update(len(data).to_bytes(8, 'little'))
+            h.update(data)
+        return h.hexdigest()
+
+    @staticmethod
+    def digest_blocks(blocks_map):
+        """
+        Serializes the parsed blocks in BlockIndex order and returns a CRC32 of the result.
+        Every field is included, so swapped or cancelling bit flips still change the value.
+        """
+        payload = json.dumps(
+            [blocks_map[idx] for idx in sorted(blocks_map.keys())],
+            ensure_ascii=False, sort_keys=True, default=str
+        ).encode('utf-8')
+        return f"{zlib.crc32(payload):08x}:{len(payload)}"
+
+    @staticmethod
+    def asset_identity(packet):
+        """Manifest hashes of the timeline + ruby files; changes whenever a game update replaces either."""
+        ruby_hash = packet['ruby']['hash'] if packet['ruby'] else ''
+        return f"{packet['timeline']['hash']}:{ruby_hash}"
+
+    @staticmethod
+    def is_error(record):
+        return any(str(record.get(stage, '')).startswith('ERROR:') for stage in STAGES)
+
+    @staticmethod
+    def first_mismatch(expected, current):
+        """
+        Compares two { stage: digest } records.
+        Returns the first stage that diverges, or None if they match.
+        """
+        for stage in STAGES:
+            if expected.get(stage) != current.get(stage):
+                return stage
+        return None
+
+    # =========================================================================
+    # PART B: BASELINE PERSISTENCE
+    # =========================================================================
+    def is_current(self, record, packet):
+        """True if a baseline record is usable for this packet (no error, same asset files)."""
+        return bool(record) and not self.is_error(record) and record.get('assets') == self.asset_identity(packet)
+
+    def load_baseline(self):
+        """Returns the saved { story_id: { 'assets': identity, stage: digest } } map, or {} if none exists."""
+        if not os.path.exists(self.baseline_path):
+            return {}
+        try:
+            with open(self.baseline_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  [Warn] Ignoring unreadable baseline {self.baseline_path}: {e}")
+            return {}
+
+    def save_baseline(self, baseline):
+        """
+        Writes the baseline atomically so a crash mid-write never leaves a corrupt file.
+        Error records are never persisted; those stories stay pending for the next run.
+        """
+        os.makedirs(os.path.dirname(self.baseline_path) or '.', exist_ok=True)
+        temp_path = self.baseline_path + '.tmp'
+        valid = {s_id: record for s_id, record in baseline.items() if not self.is_error(record)}
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(valid, f)
+        os.replace(temp_path, self.baseline_path)
@@ -0,0 +1,106 @@
+import bisect
+import os
+import threading
+
+class UmaLocality:
+    def __init__(self, config):
+        self.cfg = config
+        self.depth = config.get('READAHEAD_DEPTH', 8)
+
+    # =========================================================================
+    # PART A: ON-DISK ORDERING
+    # =========================================================================
+    @staticmethod
+    def location_key(path):
+        """
+        Sort key approximating physical placement of a dat file.
+        Hash directory first (dat/<h[:2]>/<h>), then device + inode, which most
+        filesystems allocate roughly in creation order.
+        """
+        hash_dir = os.path.basename(os.path.dirname(path))
+        try:
+            st = os.stat(path)
+            return (hash_dir, st.st_dev, st.st_ino)
+        except OSError:
+            return (hash_dir, 0, 0)
+
+    def order(self, items, get_paths):
+        """Returns items sorted by the on-disk location of their first file."""
+        keyed = []
+        for item in items:
+            paths = get_paths(item)
+            key = self.location_key(paths[0]) if paths else ('', 0, 0)
+            keyed.append((key, item))
+
+        keyed.sort(key=lambda pair: pair[0])
+        return [item for _, item in keyed]
+
+    # =========================================================================
+    # PART B: READAHEAD
+    # =========================================================================
+    def start_readahead(self, items, get_paths):
+        """Starts a readahead thread over a worker's queue. Returns None if disabled."""
+        if self.depth <= 0: return None
+        readahead = UmaReadahead(items, get_paths, self.depth)
+        readahead.start()
+        return readahead
+
+class UmaReadahead(threading.Thread):
+    """
+    Keeps the next `depth` distinct files of a worker's queue warm in the OS page cache.
+    Consecutive items often share files (every cue of a system sheet uses the same ACB/AWB),
+    so the queue is flattened into unique files before the window is applied.
+    The worker calls advance() at the start of each item.
+    """
+    def __init__(self, items, get_paths, depth):
+        super().__init__(daemon=True)
+        self.depth = depth
+        self.files = []        # Unique paths in first-use order
+        self.first_item = []   # Queue index of the item that first needs files[k]
+        seen = set()
+        for idx, item in enumerate(items):
+            for path in get_paths(item):
+                if path in seen: continue
+                seen.add(path)
+                self.files.append(path)
+                self.first_item.append(idx)
+        self.current_item = -1
+        self.cond = threading.Condition()
+        self.stopped = False
+
+    def _files_reached(self):
+        """Number of distinct files the worker has reached so far."""
+        return bisect.bisect_right(self.first_item, self.current_item)
+
+    def run(self):
+        for k, path in enumerate(self.files):
+            with self.cond:
+                self.cond.wait_for(lambda: self.stopped or k < self._files_reached() + self.depth)
+                if self.stopped: return
+            try:
+                self._prefetch(path)
+            except OSError:
+                continue
+
+    def advance(self):
+        with self.cond:
+            self.current_item += 1
+            self.cond.notify()
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
+
+    @staticmethod
+    def _prefetch(path):
+        if hasattr(os, 'posix_fadvise'):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        else:
+            # Windows: no fadvise, so read through the file to populate the cache
+            with open(path, 'rb') as f:
+                while f.read(1 << 20): pass
@@ -11,6 +11,8 @@ class UmaProcessor:
     def __init__(self, config):
         self.cfg = config
         self.pipe = None 
+        self.bytes_read = 0  # Size of each distinct ACB/AWB this instance opened (cached WAVs open nothing)
+        self._banks_counted = set()
 
     def extract_only(self, acb_path, awb_path, cue_id, output_path):
         """
@@ -30,6 +32,11 @@ class UmaProcessor:
 
         try:
             acb_file = acb.ACBFile(acb_path, awb_path, hca_keys=self.cfg['UMA_HCA_KEY'])
+            # Every cue of a sheet reopens the same bank; the OS cache serves repeats, so count each once
+            for p in (acb_path, awb_path):
+                if p and p not in self._banks_counted and os.path.exists(p):
+                    self._banks_counted.add(p)
+                    self.bytes_read += os.path.getsize(p)
             track = None
             
             # 1. System Voice (Attribute Lookup)
@@ -0,0 +1,132 @@
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+
+# Phase names passed to wrap() by main.py; reset() only ever deletes files named after these
+PHASES = ('system', 'story', 'stress_baseline', 'stress_loop1')
+OUTPUT_PATTERN = re.compile(rf"(?:{'|'.join(PHASES)})_(?:\d+\.(?:pstats|collapsed)|combined\.(?:pstats|txt|collapsed))")
+
+class UmaProfiler:
+    """
+    Optional per-worker profiling, enabled by setting config['PROFILE_DIR'] (see `--profile`).
+    When disabled, wrap() hands the task back untouched so workers pay nothing.
+    """
+    def __init__(self, config):
+        self.cfg = config
+        self.phase = None
+        self.base_paths = []
+        self.profile_dir = config.get('PROFILE_DIR')
+        self.enabled = bool(self.profile_dir)
+        self.interval = config.get('PROFILE_SAMPLE_INTERVAL', 0.005)
+
+    def wrap(self, task, pool_args, phase=None):
+        """
+        Returns (task, pool_args) for pool.starmap, routed through profiled_task if enabled.
+        Output is named <phase>_<worker_id>.*; merge() combines only the files of the last wrap().
+        """
+        if not self.enabled: return task, pool_args
+        os.makedirs(self.profile_dir, exist_ok=True)
+        self.phase = phase or task.__name__
+        self.base_paths = [os.path.join(self.profile_dir, f"{self.phase}_{args[0]}") for args in pool_args]
+        return profiled_task, [(task, base_path, self.interval) + tuple(args)
+                               for base_path, args in zip(self.base_paths, pool_args)]
+
+    def reset(self):
+        """
+        Removes output left over from a previous run.
+        Only <phase>_<worker_id>.pstats/.collapsed and <phase>_combined.* are touched,
+        so pointing --profile-dir at an existing folder never deletes unrelated files.
+        """
+        if not self.enabled or not os.path.isdir(self.profile_dir): return
+        for name in os.listdir(self.profile_dir):
+            if OUTPUT_PATTERN.fullmatch(name):
+                os.remove(os.path.join(self.profile_dir, name))
+
+    def merge(self):
+        """
+        Merges the workers of the last wrap()ped pool into:
+          <phase>_combined.pstats     - for pstats / snakeviz
+          <phase>_combined.txt        - top functions by cumulative time
+          <phase>_combined.collapsed  - folded stacks for flamegraph.pl / speedscope
+        """
+        if not self.enabled or not self.base_paths: return
+        stats_files = [p + ".pstats" for p in self.base_paths if os.path.exists(p + ".pstats")]
+        if not stats_files:
+            print(f"  [Profile] No worker profiles found for '{self.phase}'.")
+            return
+
+        combined = os.path.join(self.profile_dir, f"{self.phase}_combined")
+        stats = pstats.Stats(*stats_files)
+        stats.dump_stats(combined + ".pstats")
+        with open(combined + ".txt", 'w', encoding='utf-8') as f:
+            pstats.Stats(combined + ".pstats", stream=f).sort_stats('cumulative').print_stats(50)
+
+        stacks = {}
+        for base_path in self.base_paths:
+            if not os.path.exists(base_path + ".collapsed"): continue
+            with open(base_path + ".collapsed", 'r', encoding='utf-8') as f:
+                for line in f:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    if stack: stacks[stack] = stacks.get(stack, 0) + int(count)
+        with open(combined + ".collapsed", 'w', encoding='utf-8') as f:
+            for stack, count in sorted(stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+        print(f"  [Profile] Merged {len(stats_files)} worker profiles into {combined}.*")
+        self.base_paths = []
+
+def profiled_task(task, base_path, interval, worker_id, *args):
+    """Pool entry point: runs task(worker_id, *args) under cProfile plus a stack sampler."""
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident(), interval, root_code=profiled_task.__code__)
+    sampler.start()
+    profiler.enable()
+    try:
+        return task(worker_id, *args)
+    finally:
+        profiler.disable()
+        sampler.stop()
+        profiler.dump_stats(base_path + ".pstats")
+        sampler.dump(base_path + ".collapsed")
+
+class StackSampler(threading.Thread):
+    """
+    Samples one thread's Python stack at a fixed interval and counts folded stacks.
+    Frames above root_code (pool/bootstrap machinery) are dropped.
+    """
+    def __init__(self, target_ident, interval, root_code=None):
+        super().__init__(daemon=True)
+        self.target_ident = target_ident
+        self.interval = interval
+        self.root_code = root_code
+        self.stacks = {}
+        self.halt = threading.Event()
+
+    def run(self):
+        while not self.halt.wait(self.interval):
+            frame = sys._current_frames().get(self.target_ident)
+            if frame is None: continue
+            names = []
+            # Walk from the leaf up to (but excluding) the profiling wrapper
+            while frame is not None and frame.f_code is not self.root_code:
+                code = frame.f_code
+                if code is StackSampler.stop.__code__:
+                    names = None  # Target is shutting the sampler down; not part of the task
+                    break
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if not names or self.halt.is_set(): continue
+            stack = ";".join(reversed(names))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def stop(self):
+        self.halt.set()
+        self.join()
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.items():
+                f.write(f"{stack} {count}\n")
@@ -0,0 +1,183 @@
+import csv
+import os
+import re
+import shutil
+import sqlite3
+
+STORE_PATH = 'global_transcripts.db'
+
+# Table -> (source CSV, [(column, SQL type)], FTS columns, B-tree indexed columns)
+TABLES = {
+    'story': (
+        'global_story_deep_scan.csv',
+        [('StoryId', 'TEXT'), ('BlockIndex', 'INTEGER'), ('CharaId', 'INTEGER'), ('SpeakerName', 'TEXT'),
+         ('Text', 'TEXT'), ('RubyText', 'TEXT'), ('VoiceSheetId', 'TEXT'), ('CueId', 'INTEGER'),
+         ('AudioFilePath', 'TEXT'), ('AudioLength', 'REAL'), ('CharacterPerSecond', 'REAL')],
+        ['Text', 'RubyText'],
+        ['CharaId', 'StoryId', 'VoiceSheetId', 'AudioLength']
+    ),
+    'system': (
+        'global_system_voices.csv',
+        [('Text', 'TEXT'), ('CharaId', 'INTEGER'), ('AudioFilePath', 'TEXT')],
+        ['Text'],
+        ['CharaId']
+    ),
+}
+
+FILTER_PATTERN = re.compile(r'^\s*(\w+)\s*(<=|>=|!=|=|<|>)\s*(.+?)\s*$')
+
+class UmaStore:
+    def __init__(self, config, path=STORE_PATH):
+        self.cfg = config
+        self.path = path
+
+    # =========================================================================
+    # PART A: INDEXER (CSV -> SQLite)
+    # =========================================================================
+    def build(self):
+        """Loads the scan CSVs into SQLite with FTS5 on the text columns and B-tree indexes on the filters."""
+        con = sqlite3.connect(self.path)
+        try:
+            for table, (csv_path, schema, fts_cols, index_cols) in TABLES.items():
+                if not os.path.exists(csv_path):
+                    print(f"  -> {csv_path} not found, skipping '{table}'.")
+                    continue
+                self._build_table(con, table, csv_path, schema, fts_cols, index_cols)
+            con.commit()
+        finally:
+            con.close()
+        print(f"Transcript Store Complete. Saved to {self.path}.")
+
+    def _build_table(self, con, table, csv_path, schema, fts_cols, index_cols):
+        cur = con.cursor()
+        columns = [name for name, _ in schema]
+        cur.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        cur.execute(f"DROP TABLE IF EXISTS {table}")
+        cur.execute(f"CREATE TABLE {table} ({', '.join(f'{name} {sql_type}' for name, sql_type in schema)})")
+        cur.execute("CREATE TABLE IF NOT EXISTS store_meta (tbl TEXT PRIMARY KEY, tokenizer TEXT)")
+        cur.execute("DELETE FROM store_meta WHERE tbl = ?", (table,))
+
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            rows = ([row.get(name, '') for name in columns] for row in reader)
+            cur.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})", rows)
+
+        # Indexes are built after the bulk insert; much faster than maintaining them per row
+        for name in index_cols:
+            cur.execute(f"CREATE INDEX idx_{table}_{name} ON {table} ({name})")
+
+        # Trigram tokenizer gives substring search, which Japanese text needs (no word spacing)
+        fts_columns = ', '.join(fts_cols)
+        for tokenizer in ('trigram', 'unicode61'):
+            try:
+                cur.execute(f"CREATE VIRTUAL TABLE {table}_fts USING fts5({fts_columns}, "
+                            f"content='{table}', content_rowid='rowid', tokenize='{tokenizer}')")
+                cur.execute(f"INSERT INTO {table}_fts(rowid, {fts_columns}) SELECT rowid, {fts_columns} FROM {table}")
+                cur.execute("INSERT INTO store_meta (tbl, tokenizer) VALUES (?, ?)", (table, tokenizer))
+                break
+            except sqlite3.OperationalError as e:
+                cur.execute(f"DROP TABLE IF EXISTS {table}_fts")
+                print(f"  [Warn] FTS5 tokenizer {tokenizer} unavailable for '{table}': {e}")
+
+        count = cur.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        print(f"  -> Indexed {count} rows into '{table}'.")
+
+    # =========================================================================
+    # PART B: SUBSET EXPORT
+    # =========================================================================
+    def query(self, table, filters=(), match=None):
+        """
+        Returns (columns, rows) matching every filter and the optional text match.
+        filters: expressions like "CharaId=1001", "AudioLength>=2", "CharacterPerSecond<12".
+        match:   substring searched in the FTS columns (Text/RubyText).
+        """
+        if table not in TABLES:
+            raise ValueError(f"Unknown table '{table}'. Choose from: {', '.join(TABLES)}")
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Transcript store not found at {self.path}. Run 'python main.py index' first.")
+
+        _, schema, fts_cols, _ = TABLES[table]
+        columns = [name for name, _ in schema]
+        clauses, params = [], []
+
+        for expr in filters:
+            m = FILTER_PATTERN.match(expr)
+            if not m or m.group(1) not in columns:
+                raise ValueError(f"Invalid filter '{expr}'. Use <Column><op><value> with a column from: {', '.join(columns)}")
+            clauses.append(f"t.{m.group(1)} {m.group(2)} ?")
+            params.append(m.group(3))
+
+        con = sqlite3.connect(self.path)
+        try:
+            cur = con.cursor()
+            if match:
+                # Only trigram FTS does substring search (unicode61 cannot split unspaced Japanese),
+                # and it needs at least 3 characters; anything else falls back to a LIKE scan
+                try:
+                    meta = cur.execute("SELECT tokenizer FROM store_meta WHERE tbl = ?", (table,)).fetchone()
+                except sqlite3.OperationalError:
+                    meta = None
+                if meta and meta[0] == 'trigram' and len(match) >= 3:
+                    clauses.append(f"t.rowid IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)")
+                    params.append('"' + match.replace('"', '""') + '"')
+                else:
+                    clauses.append("(" + " OR ".join(f"t.{col} LIKE ?" for col in fts_cols) + ")")
+                    params.extend([f"%{match}%"] * len(fts_cols))
+
+            sql = f"SELECT {', '.join('t.' + c for c in columns)} FROM {table} t"
+            if clauses: sql += " WHERE " + " AND ".join(clauses)
+            return columns, cur.execute(sql, params).fetchall()
+        finally:
+            con.close()
+
+    def export(self, table, out_dir, filters=(), match=None, audio_mode='none'):
+        """
+        Writes the matching rows to <out_dir>/metadata.csv.
+        audio_mode: 'none' keeps the original AudioFilePath, 'copy' / 'hardlink' place the
+        WAVs under <out_dir>/audio/ and rewrite AudioFilePath relative to <out_dir>
+        (e.g. audio/story/...), so the subset folder can be moved as a whole.
+        """
+        columns, rows = self.query(table, filters, match)
+        os.makedirs(out_dir, exist_ok=True)
+        path_idx = columns.index('AudioFilePath')
+        output_root = self.cfg['PATHS']['output']
+        audio_count = 0
+
+        out_csv = os.path.join(out_dir, 'metadata.csv')
+        with open(out_csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                row = list(row)
+                src = row[path_idx]
+                if audio_mode != 'none' and src and src != "FAILED" and os.path.exists(src):
+                    rel = self._audio_subpath(src, output_root)
+                    self._place_audio(src, os.path.join(out_dir, rel), audio_mode)
+                    row[path_idx] = rel.replace(os.sep, '/')
+                    audio_count += 1
+                writer.writerow(row)
+
+        print(f"Exported {len(rows)} rows to {out_csv}" + (f" ({audio_count} audio files, {audio_mode})." if audio_mode != 'none' else "."))
+        return len(rows)
+
+    @staticmethod
+    def _audio_subpath(src, output_root):
+        """Path of an exported WAV relative to the subset folder: audio/<path under output root>."""
+        try:
+            rel = os.path.relpath(src, output_root)
+        except ValueError:
+            rel = None  # Windows: WAV and output root are on different drives
+        if not rel or rel.startswith('..'): rel = os.path.basename(src)
+        return os.path.join('audio', rel)
+
+    @staticmethod
+    def _place_audio(src, dst, audio_mode):
+        if os.path.exists(dst): return
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        if audio_mode == 'hardlink':
+            try:
+                os.link(src, dst)
+                return
+            except OSError:
+                pass  # Cross-device or unsupported filesystem: fall back to a copy
+        shutil.copy2(src, dst)
@@ -1,13 +1,22 @@
+import argparse
 import json
 import csv
 import os
 import glob
 import multiprocessing
 import random
+import shutil
 import time
+import tempfile
+import UnityPy
 from core.crypto import UmaCrypto
 from core.provider import UmaProvider
 from core.processor import UmaProcessor
+from core.integrity import UmaIntegrity
+from core.locality import UmaLocality
+from core.autotune import UmaAutotuner, timed_task
+from core.profiling import UmaProfiler
+from core.store import UmaStore
 
 # --- CONFIGURATION ---
 # Removed 'Transcript', Added 'AudioLength' and 'CharacterPerSecond'
@@ -92,15 +101,58 @@ def apply_ruby(env_ruby, blocks_map):
                     return 
             except: continue
 
+def system_entry_paths(entry):
+    """Dat files read for one system voice entry (used for locality ordering/readahead)."""
+    return [p for p in (entry['acb_path'], entry['awb_path']) if p]
+
+def story_packet_paths(packet):
+    """Dat files read for one story packet. Voice banks are only known after decryption."""
+    paths = [packet['timeline']['path']]
+    if packet['ruby']: paths.append(packet['ruby']['path'])
+    return paths
+
+def collect_story_packets(config, provider, meta_con):
+    """Builds one packet per story timeline, paired with its ruby asset if present."""
+    query = "SELECT n, h, e FROM a WHERE n LIKE '%storytimeline_%' AND n NOT LIKE '%resource%'"
+    timeline_rows = meta_con.cursor().execute(query).fetchall()
+    ruby_index = provider._get_global_ruby_index(meta_con.cursor())
+    
+    all_packets = []
+    for t_name, t_hash, t_key in timeline_rows:
+        story_id_str = t_name.split('_')[-1]
+        t_item = {
+            'name': t_name, 'hash': t_hash, 'encryption_key': t_key,
+            'path': os.path.join(config['PATHS']['dat'], t_hash[:2], t_hash)
+        }
+        all_packets.append({
+            'story_id': story_id_str, 'timeline': t_item,
+            'ruby': ruby_index.get(story_id_str)
+        })
+    return all_packets
+
+def report_throughput(total_bytes, duration):
+    """
+    total_bytes: timeline/ruby bytes read plus the size of each distinct ACB/AWB a worker opened.
+    AWB banks are counted in full although only the needed tracks are decoded, so this is an upper bound.
+    """
+    mb = total_bytes / (1024 * 1024)
+    rate = mb / duration if duration > 0 else 0
+    print(f"  -> Dat I/O (est., unique files per worker): {mb:.1f} MB in {duration:.2f}s ({rate:.1f} MB/s)")
+
 # --- WORKER: SYSTEM SCAN ---
-def system_worker_task(worker_id, chunk, config):
+def system_worker_task(worker_id, chunk, config, locality=False):
+    """Returns (status message, bytes read from dat files)."""
+    readahead = None
+    processor = UmaProcessor(config)
     try:
-        processor = UmaProcessor(config)
         temp_filename = f"temp_sys_worker_{worker_id}.csv"
+        if locality:
+            readahead = UmaLocality(config).start_readahead(chunk, system_entry_paths)
         
         with open(temp_filename, 'w', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=SYSTEM_CSV_COLUMNS)
             for entry in chunk:
+                if readahead: readahead.advance()
                 c_id = entry['character_id']
                 out_dir = os.path.join(processor.cfg['PATHS']['output'], "system", str(c_id))
                 fname = f"sys_{c_id}_{entry['cue_sheet']}_{entry['cue_id']}.wav"
@@ -114,11 +166,13 @@ def system_worker_task(worker_id, chunk, config):
                     writer.writerow({
                         'Text': entry['transcript'], 'CharaId': entry['character_id'], 'AudioFilePath': final_path
                     })
-        return f"SysWorker {worker_id} done."
+        return f"SysWorker {worker_id} done.", processor.bytes_read
     except Exception as e:
-        return f"SysWorker {worker_id} CRASHED: {e}"
+        return f"SysWorker {worker_id} CRASHED: {e}", processor.bytes_read
+    finally:
+        if readahead: readahead.stop()
 
-def run_system_scan(config, test_mode=False):
+def run_system_scan(config, test_mode=False, locality=False):
     print("\n=== PHASE 1: SYSTEM TEXT SCAN ===")
     
     crypto = UmaCrypto(config)
@@ -127,19 +181,27 @@ def run_system_scan(config, test_mode=False):
     random.shuffle(system_map)
     
     if test_mode: system_map = system_map[:1000]
+
+    if locality:
+        print("  -> Ordering entries by on-disk location...")
+        system_map = UmaLocality(config).order(system_map, system_entry_paths)
         
-    num_workers = max(1, (os.cpu_count() or 4))
+    num_workers, chunk_size = UmaAutotuner(config).get_settings('system', len(system_map))
     print(f"  -> Processing {len(system_map)} entries with {num_workers} processes...")
     
-    chunk_size = len(system_map) // num_workers + 1
     chunks = [system_map[i:i + chunk_size] for i in range(0, len(system_map), chunk_size)]
     
     pool_args = []
     for i, chunk in enumerate(chunks):
-        pool_args.append((i, chunk, config))
+        pool_args.append((i, chunk, config, locality))
         
+    profiler = UmaProfiler(config)
+    task, pool_args = profiler.wrap(system_worker_task, pool_args, phase='system')
+    start_time = time.time()
     with multiprocessing.Pool(processes=num_workers) as pool:
-        pool.starmap(system_worker_task, pool_args)
+        results = pool.starmap(task, pool_args)
+    report_throughput(sum(bytes_read for _, bytes_read in results), time.time() - start_time)
+    profiler.merge()
 
     print("Merging System CSVs...")
     final_csv = 'global_system_voices.csv'
@@ -156,16 +218,21 @@ def run_system_scan(config, test_mode=False):
     print(f"System Scan Complete. Merged {count} files.")
 
 # --- WORKER: STORY SCAN ---
-def story_worker_task(worker_id, story_chunk, shared_audio_map, config):
+def story_worker_task(worker_id, story_chunk, shared_audio_map, config, locality=False):
+    """Returns (status message, bytes read from dat files)."""
+    readahead = None
+    crypto = UmaCrypto(config)
+    processor = UmaProcessor(config)
     try:
-        crypto = UmaCrypto(config)
-        processor = UmaProcessor(config)
         temp_filename = f"temp_story_worker_{worker_id}.csv"
+        if locality:
+            readahead = UmaLocality(config).start_readahead(story_chunk, story_packet_paths)
         
         with open(temp_filename, 'w', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=STORY_CSV_COLUMNS)
             
             for packet in story_chunk:
+                if readahead: readahead.advance()
                 story_id = packet['story_id']
                 try:
                     env_tl = crypto.decrypt_asset(packet['timeline'])
@@ -224,11 +291,13 @@ def story_worker_task(worker_id, story_chunk, shared_audio_map, config):
                         })
                 except Exception as e:
                     print(f"[{worker_id}] Error {story_id}: {e}")
-        return f"StoryWorker {worker_id} done."
+        return f"StoryWorker {worker_id} done.", crypto.bytes_read + processor.bytes_read
     except Exception as e:
-        return f"StoryWorker {worker_id} CRASHED: {e}"
+        return f"StoryWorker {worker_id} CRASHED: {e}", crypto.bytes_read + processor.bytes_read
+    finally:
+        if readahead: readahead.stop()
 
-def run_story_scan(config, test_mode=False):
+def run_story_scan(config, test_mode=False, locality=False):
     print("\n=== PHASE 2: STORY SCAN ===")
     
     manager = multiprocessing.Manager()
@@ -243,40 +312,35 @@ def run_story_scan(config, test_mode=False):
     shared_audio_map.update(raw_audio_map)
     
     print("Collecting story packets...")
-    all_packets = []
-    
-    query = "SELECT n, h, e FROM a WHERE n LIKE '%storytimeline_%' AND n NOT LIKE '%resource%'"
-    timeline_rows = meta_con.cursor().execute(query).fetchall()
-    ruby_index = provider._get_global_ruby_index(meta_con.cursor())
-    
-    for t_name, t_hash, t_key in timeline_rows:
-        story_id_str = t_name.split('_')[-1]
-        t_item = {
-            'name': t_name, 'hash': t_hash, 'encryption_key': t_key,
-            'path': os.path.join(config['PATHS']['dat'], t_hash[:2], t_hash)
-        }
-        all_packets.append({
-            'story_id': story_id_str, 'timeline': t_item,
-            'ruby': ruby_index.get(story_id_str)
-        })
+    all_packets = collect_story_packets(config, provider, meta_con)
 
     random.shuffle(all_packets)
     if test_mode: all_packets = all_packets[:1000]
 
-    num_workers = max(1, (os.cpu_count() or 4))
+    if locality:
+        print("Ordering stories by on-disk location...")
+        all_packets = UmaLocality(config).order(all_packets, story_packet_paths)
+
+    num_workers, chunk_size = UmaAutotuner(config).get_settings('story', len(all_packets))
     print(f"Spawning {num_workers} workers for {len(all_packets)} stories...")
     
-    chunk_size = len(all_packets) // num_workers + 1
     chunks = [all_packets[i:i + chunk_size] for i in range(0, len(all_packets), chunk_size)]
     
     pool_args = []
     for i, chunk in enumerate(chunks):
-        pool_args.append((i, chunk, shared_audio_map, config))
+        pool_args.append((i, chunk, shared_audio_map, config, locality))
 
+    profiler = UmaProfiler(config)
+    task, pool_args = profiler.wrap(story_worker_task, pool_args, phase='story')
+    start_time = time.time()
     with multiprocessing.Pool(processes=num_workers) as pool:
-        results_iterator = pool.starmap_async(story_worker_task, pool_args)
-        for result in results_iterator.get():
+        results_iterator = pool.starmap_async(task, pool_args)
+        total_bytes = 0
+        for result, bytes_read in results_iterator.get():
             print(f"  -> {result}")
+            total_bytes += bytes_read
+    report_throughput(total_bytes, time.time() - start_time)
+    profiler.merge()
 
     print("Merging Story CSVs...")
     final_csv = 'global_story_deep_scan.csv'
@@ -296,40 +360,43 @@ def run_story_scan(config, test_mode=False):
 def stress_worker_task(worker_id, chunk, config):
     """
     CPU/RAM Stress with Integrity Check.
-    Calculates a checksum of all decrypted text and coordinates.
-    Returns: { 'story_id': checksum_int }
+    Hashes the raw decrypted buffers (decrypt stage) and the serialized parsed blocks (parse stage).
+    Returns: { 'story_id': { 'assets': manifest hashes, 'decrypt': digest, 'parse': digest } }
     """
     crypto = UmaCrypto(config)
     checksums = {}
     
     for packet in chunk:
         story_id = packet['story_id']
-        local_sum = 0
+        record = {'assets': UmaIntegrity.asset_identity(packet)}
         try:
-            # 1. Decrypt Timeline (Heavy Integer Math)
-            env_tl = crypto.decrypt_asset(packet['timeline'])
-            blocks_map = parse_blocks(env_tl)
-            
-            # 2. Decrypt Ruby
-            if packet['ruby']:
-                env_ruby = crypto.decrypt_asset(packet['ruby'])
-                apply_ruby(env_ruby, blocks_map)
+            # 1. Decrypt Timeline + Ruby (Heavy Integer Math)
+            tl_bytes = crypto.decrypt_bytes(packet['timeline'])
+            ruby_bytes = crypto.decrypt_bytes(packet['ruby']) if packet['ruby'] else b''
+            record['decrypt'] = UmaIntegrity.digest_buffer(tl_bytes, ruby_bytes)
+        except Exception as e:
+            record['decrypt'] = f"ERROR: {e}"
+            checksums[story_id] = record
+            continue
+
+        try:
+            # 2. Parse (UnityPy -> Blocks)
+            blocks_map = parse_blocks(UnityPy.load(tl_bytes))
+            if ruby_bytes:
+                apply_ruby(UnityPy.load(ruby_bytes), blocks_map)
             
             # 3. Calculate Checksum (Verify Integrity)
-            for idx, block in blocks_map.items():
-                local_sum += idx
-                if block['Text']:
-                    for char in block['Text']: local_sum += ord(char)
-                if block['SpeakerName']:
-                    for char in block['SpeakerName']: local_sum += ord(char)
-                if block['RubyInfo']:
-                    for char in block['RubyInfo']: local_sum += ord(char)
-
-            checksums[story_id] = local_sum
-        except Exception:
-            checksums[story_id] = -1 
+            record['parse'] = UmaIntegrity.digest_blocks(blocks_map)
+        except Exception as e:
+            record['parse'] = f"ERROR: {e}"
+        checksums[story_id] = record
     return checksums
 
+def run_packed_task(packed):
+    """imap_unordered entry point: packed is (task, args)."""
+    task, args = packed
+    return task(*args)
+
 def run_stress_test(config):
     print("\n=== PHASE 3: OVERCLOCKING STRESS TEST (Integrity Mode) ===")
     print("  [Info] Running Decryption -> Parsing -> Checksum.")
@@ -338,46 +405,50 @@ def run_stress_test(config):
     
     crypto = UmaCrypto(config)
     provider = UmaProvider(crypto, config)
+    integrity = UmaIntegrity(config)
     
     print("Loading asset map...")
     meta_con = crypto.get_meta_connection()
-    
-    query = "SELECT n, h, e FROM a WHERE n LIKE '%storytimeline_%' AND n NOT LIKE '%resource%'"
-    timeline_rows = meta_con.cursor().execute(query).fetchall()
-    ruby_index = provider._get_global_ruby_index(meta_con.cursor())
-    
-    all_packets = []
-    for t_name, t_hash, t_key in timeline_rows:
-        story_id_str = t_name.split('_')[-1]
-        t_item = {
-            'name': t_name, 'hash': t_hash, 'encryption_key': t_key,
-            'path': os.path.join(config['PATHS']['dat'], t_hash[:2], t_hash)
-        }
-        all_packets.append({
-            'story_id': story_id_str, 'timeline': t_item,
-            'ruby': ruby_index.get(story_id_str)
-        })
+    all_packets = collect_story_packets(config, provider, meta_con)
 
-    num_workers = max(1, (os.cpu_count() or 4))
+    tuner = UmaAutotuner(config)
+    profiler = UmaProfiler(config)
+    num_workers, chunk_size = tuner.get_settings('stress', len(all_packets))
     print(f"Spawning {num_workers} workers for {len(all_packets)} items...")
     
-    # BASELINE PASS (Loop 0)
-    print("  -> Generating Baseline Checksums (Loop 0)...")
-    baseline_checksums = {}
+    # BASELINE PASS (Loop 0) - resumes from disk if a previous run crashed.
+    # Entries whose timeline/ruby manifest hash changed (game update) are recomputed.
+    saved = integrity.load_baseline()
+    baseline_checksums = {
+        p['story_id']: saved[p['story_id']] for p in all_packets
+        if integrity.is_current(saved.get(p['story_id']), p)
+    }
+    pending = [p for p in all_packets if p['story_id'] not in baseline_checksums]
+    if saved:
+        print(f"  -> Reusing {len(baseline_checksums)} of {len(saved)} saved baseline checksums from {integrity.baseline_path}")
     
-    chunk_size = len(all_packets) // num_workers + 1
-    chunks = [all_packets[i:i + chunk_size] for i in range(0, len(all_packets), chunk_size)]
-    pool_args = []
-    for i, chunk in enumerate(chunks):
-        pool_args.append((i, chunk, config))
-        
-    with multiprocessing.Pool(processes=num_workers) as pool:
-        results = pool.starmap(stress_worker_task, pool_args)
+    if pending:
+        print(f"  -> Generating Baseline Checksums (Loop 0) for {len(pending)} files...")
+        # Small chunks so progress is saved often; Loop 0 is where an unstable overclock usually dies
+        pending_chunk_size = len(pending) // (num_workers * 8) + 1
+        chunks = [pending[i:i + pending_chunk_size] for i in range(0, len(pending), pending_chunk_size)]
+        pool_args = [(i, chunk, config) for i, chunk in enumerate(chunks)]
+        task, pool_args = profiler.wrap(stress_worker_task, pool_args, phase='stress_baseline')
         
-    for res in results:
-        baseline_checksums.update(res)
+        failed = 0
+        with multiprocessing.Pool(processes=num_workers) as pool:
+            for res in pool.imap_unordered(run_packed_task, [(task, args) for args in pool_args]):
+                for s_id, record in res.items():
+                    if UmaIntegrity.is_error(record):
+                        failed += 1
+                    else:
+                        baseline_checksums[s_id] = record
+                integrity.save_baseline(baseline_checksums)
+        profiler.merge()
+        if failed:
+            print(f"  -> {failed} files failed during Loop 0; they are left pending and skipped this run.")
         
-    print(f"  -> Baseline created for {len(baseline_checksums)} files.")
+    print(f"  -> Baseline ready for {len(baseline_checksums)} files ({integrity.baseline_path}).")
     
     # STRESS LOOP
     loop_count = 1
@@ -388,17 +459,24 @@ def run_stress_test(config):
             random.shuffle(all_packets)
             chunks = [all_packets[i:i + chunk_size] for i in range(0, len(all_packets), chunk_size)]
             pool_args = [(i, chunk, config) for i, chunk in enumerate(chunks)]
+            task = stress_worker_task
+            if loop_count == 1:
+                # Later loops repeat the same work; profiling one keeps the output bounded
+                task, pool_args = profiler.wrap(task, pool_args, phase='stress_loop1')
             
             with multiprocessing.Pool(processes=num_workers) as pool:
-                loop_results = pool.starmap(stress_worker_task, pool_args)
+                loop_results = pool.starmap(task, pool_args)
+            if loop_count == 1: profiler.merge()
             
             errors = 0
             for res_dict in loop_results:
-                for s_id, current_sum in res_dict.items():
-                    base_sum = baseline_checksums.get(s_id, 0)
-                    if current_sum != base_sum:
-                        print(f"\n[FATAL ERROR] Checksum Mismatch on Story {s_id}!")
-                        print(f"  Expected: {base_sum}, Got: {current_sum}")
+                for s_id, current in res_dict.items():
+                    expected = baseline_checksums.get(s_id)
+                    if not expected: continue  # No trustworthy baseline yet
+                    stage = UmaIntegrity.first_mismatch(expected, current)
+                    if stage:
+                        print(f"\n[FATAL ERROR] Checksum Mismatch on Story {s_id} at stage '{stage}'!")
+                        print(f"  Expected: {expected.get(stage)}, Got: {current.get(stage)}")
                         errors += 1
             
             duration = time.time() - start_time
@@ -412,9 +490,80 @@ def run_stress_test(config):
     except KeyboardInterrupt:
         print("\n\n*** Stress Test Stopped by User ***\n")
 
+# --- AUTOTUNE: WORKER/BATCH CALIBRATION ---
+def run_calibration_trial(pool, task, sample, extra_args, chunk_size):
+    """Runs one calibration trial and returns the CPU seconds spent by its workers."""
+    chunks = [sample[i:i + chunk_size] for i in range(0, len(sample), chunk_size)]
+    pool_args = [(task, i, chunk) + extra_args for i, chunk in enumerate(chunks)]
+    return sum(pool.starmap(timed_task, pool_args))
+
+def reset_calibration_output(trial_output):
+    """Clears trial side effects: extracted WAVs (so no trial hits a cached WAV) and temp CSVs."""
+    for entry in os.listdir(trial_output):
+        shutil.rmtree(os.path.join(trial_output, entry), ignore_errors=True)
+    # Trials must not leak rows into the next real scan's merge step
+    for temp_file in glob.glob("temp_sys_worker_*.csv") + glob.glob("temp_story_worker_*.csv"):
+        os.remove(temp_file)
+
+def run_autotune(config):
+    print("\n=== AUTOTUNE: WORKER/BATCH CALIBRATION ===")
+    
+    tuner = UmaAutotuner(config)
+    crypto = UmaCrypto(config)
+    provider = UmaProvider(crypto, config)
+    
+    system_map = provider.get_global_system_voice_map()
+    meta_con = crypto.get_meta_connection()
+    story_packets = collect_story_packets(config, provider, meta_con)
+    
+    manager = multiprocessing.Manager()
+    shared_audio_map = manager.dict()
+    shared_audio_map.update(provider._get_global_audio_index(meta_con.cursor()))
+    
+    print(f"  [Info] Timing {len(tuner.candidates())} settings x {tuner.repeats} repeats on the same "
+          f"{tuner.sample_size}-item sample per scan type.")
+    
+    # Extract into a throwaway folder, emptied before every trial
+    with tempfile.TemporaryDirectory() as trial_output:
+        trial_config = dict(config)
+        trial_config['PATHS'] = dict(config['PATHS'], output=trial_output)
+        trial_config.pop('PROFILE_DIR', None)  # profiling would skew the timings
+        
+        reset = lambda: reset_calibration_output(trial_output)
+        
+        tuner.calibrate('system', system_map, lambda pool, sample, chunk_size: run_calibration_trial(
+            pool, system_worker_task, sample, (trial_config,), chunk_size), system_entry_paths, reset)
+        tuner.calibrate('story', story_packets, lambda pool, sample, chunk_size: run_calibration_trial(
+            pool, story_worker_task, sample, (shared_audio_map, trial_config), chunk_size), story_packet_paths, reset)
+        if config['EXPOSE_STRESS_MODE']:
+            tuner.calibrate('stress', story_packets, lambda pool, sample, chunk_size: run_calibration_trial(
+                pool, stress_worker_task, sample, (trial_config,), chunk_size), story_packet_paths, reset)
+    
+    tuner.save()
+    print(f"Autotune Complete. Saved to {tuner.path}.")
+
 # --- MAIN ENTRY POINT ---
 def main():
     multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Uma Voice Dataset Creator & Stress Tester")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile every scan worker (cProfile + stack sampling) and merge the results per phase")
+    parser.add_argument('--profile-dir', default='profile', metavar='DIR',
+                        help="Where --profile writes its output (default: profile/)")
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('index', help="Load the scan CSVs into the SQLite transcript store")
+    export_parser = subparsers.add_parser('export', help="Export a filtered subset from the transcript store")
+    export_parser.add_argument('out_dir', help="Folder to write metadata.csv (and audio/) into")
+    export_parser.add_argument('--table', choices=['story', 'system'], default='story')
+    export_parser.add_argument('--where', action='append', default=[], metavar='EXPR',
+                               help="Filter like CharaId=1001, AudioLength>=2, CharacterPerSecond<12 (repeatable, ANDed)")
+    export_parser.add_argument('--match', metavar='TEXT', help="Only rows whose Text/RubyText contains TEXT")
+    export_parser.add_argument('--audio', choices=['none', 'copy', 'hardlink'], default='none',
+                               help="Copy or hardlink the matching WAVs into out_dir/audio/")
+    args = parser.parse_args()
+    if args.profile and args.command:
+        parser.error("--profile only applies to the interactive scans, not to 'index' or 'export'")
+
     if not os.path.exists('config/keys.json'):
         print("Error: config/keys.json not found.")
         return
@@ -422,6 +571,20 @@ def main():
     with open('config/keys.json', 'r') as f: 
         config = json.load(f)
 
+    if args.command == 'index':
+        UmaStore(config).build()
+        return
+    if args.command == 'export':
+        try:
+            UmaStore(config).export(args.table, args.out_dir, args.where, args.match, args.audio)
+        except (ValueError, FileNotFoundError) as e:
+            print(f"Error: {e}")
+        return
+
+    if args.profile:
+        config['PROFILE_DIR'] = args.profile_dir
+        UmaProfiler(config).reset()
+
     if not os.path.exists(config['PATHS']['output']):
         os.makedirs(config['PATHS']['output'])
 
@@ -433,6 +596,9 @@ def main():
             do_stress_str = input(f"{qn_num}. Do story scan stress test? (Y/N): ").strip().upper()
             qn_num += 1
             do_stress = (do_stress_str == 'Y')
+        do_tune_str = input(f"{qn_num}. Run autotune calibration first (saves config/tuning.json)? (Y/N): ").strip().upper()
+        qn_num += 1
+        do_tune = (do_tune_str == 'Y')
         do_system_str = "F"
         do_story_str = "F"
         if not do_stress:
@@ -444,9 +610,9 @@ def main():
         
         do_system = (do_system_str == 'Y')
         do_story = (do_story_str == 'Y')
-        if not do_system and not do_story:
+        if not do_system and not do_story and not do_tune:
             if config['EXPOSE_STRESS_MODE'] and not do_stress or not config['EXPOSE_STRESS_MODE']:
-                print("\nAt least system or story has to be selected. Restarting selection...\n")
+                print("\nAt least system, story or autotune has to be selected. Restarting selection...\n")
                 continue
         
         do_test = False
@@ -454,14 +620,22 @@ def main():
             do_test_str = input(f"{qn_num}. Enable Test Mode (Limit 1000 rows)? (Y/N): ").strip().upper()
             qn_num += 1
             do_test = (do_test_str == 'Y')
+
+        do_locality = False
+        if not do_stress and (do_system or do_story):
+            do_locality_str = input(f"{qn_num}. Enable Locality Mode (on-disk ordering + readahead)? (Y/N): ").strip().upper()
+            qn_num += 1
+            do_locality = (do_locality_str == 'Y')
         
         print("\n--- CONFIRM OPTIONS ---")
+        print(f"  > Autotune:      {'[YES]' if do_tune else '[NO]'}")
         if config['EXPOSE_STRESS_MODE']:
             print(f"  > Stress Test:   {'[YES] (Infinite Loop)' if do_stress else '[NO]'}")
         if not do_stress:
             print(f"  > System Scan:   {'[YES]' if do_system else '[NO]'}")
             print(f"  > Story Scan:    {'[YES]' if do_story else '[NO]'}")
             print(f"  > Test Mode:     {'[YES] (Limit 1000)' if do_test else '[NO] (Full Scan)'}")
+            print(f"  > Locality Mode: {'[YES]' if do_locality else '[NO] (Random Order)'}")
         print("-----------------------")
         
         confirm = input("Confirm selection? (Y/N): ").strip().upper()
@@ -473,13 +647,20 @@ def main():
 
     print("\nStarting Engine...")
     
+    if do_tune:
+        run_autotune(config)
+    
     if do_stress:
         run_stress_test(config)
     else:
         if do_system:
-            run_system_scan(config, test_mode=do_test)
+            run_system_scan(config, test_mode=do_test, locality=do_locality)
         if do_story:
-            run_story_scan(config, test_mode=do_test)
+            run_story_scan(config, test_mode=do_test, locality=do_locality)
+
+    if do_system or do_story:
+        print("\nBuilding transcript store...")
+        UmaStore(config).build()
 
     print("\nALL OPERATIONS COMPLETE.")
 